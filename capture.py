@@ -1,5 +1,9 @@
+import struct
 import subprocess
 import os
+import wave
+
+import numpy as np
 
 
 def get_youtube_audio_url(youtube_id: str) -> str:
@@ -52,6 +56,101 @@ def capture_audio(stream_url: str, output_file: str, duration: int = 20, source_
         error = result.stderr.decode("utf-8", errors="ignore")[-200:]
         raise RuntimeError(f"{source_name} capture failed: {error}")
     
-    # Verify file was created and has content
-    if not os.path.exists(output_file) or os.path.getsize(output_file) < 1000:
+    # Verify file was created and has content (one stat, not exists+getsize)
+    try:
+        too_small = os.stat(output_file).st_size < 1000
+    except OSError:
+        too_small = True
+    if too_small:
         raise RuntimeError(f"{source_name} capture produced empty file")
+
+
+def _wav_stream_header(sample_rate: int = 16000, channels: int = 1) -> bytes:
+    """Minimal WAV header with unknown length (same as ffmpeg writes to pipes)."""
+    byte_rate = sample_rate * channels * 2
+    return b"".join([
+        b"RIFF", struct.pack("<I", 0xFFFFFFFF), b"WAVE",
+        b"fmt ", struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, channels * 2, 16),
+        b"data", struct.pack("<I", 0xFFFFFFFF),
+    ])
+
+
+def capture_and_fingerprint(stream_url: str, output_file: str, duration: int = 20, source_name: str = "stream") -> tuple:
+    """
+    Capture audio from a stream URL, decoding it exactly once.
+
+    ffmpeg emits raw s16le PCM on stdout; from that single in-memory buffer
+    we write the WAV file ourselves, fingerprint the PCM (in-process via
+    the chromaprint bindings, or fpcalc over stdin when the library is
+    missing), and build the sample array for the offset detector — nothing
+    downstream has to re-read or re-decode the file.
+
+    Returns (fingerprint, samples): fingerprint is the raw chromaprint
+    string or None if fingerprinting failed; samples is a float32 mono
+    array at 16 kHz.
+    """
+    from compare import find_fpcalc, _fingerprint_pcm
+
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+
+    # Headers for website streams (Akamai CDN requires this)
+    headers = (
+        "Referer: https://aajtak.in/ "
+        "User-Agent: Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+    )
+
+    cmd = [
+        "ffmpeg",
+        "-headers", headers,
+        "-i", stream_url,
+        "-t", str(duration),
+        "-vn",
+        "-ac", "1",
+        "-ar", "16000",
+        "-f", "s16le",
+        "pipe:1",
+    ]
+
+    ffmpeg_proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        raw, _ = ffmpeg_proc.communicate(timeout=duration + 60)
+    except subprocess.TimeoutExpired:
+        ffmpeg_proc.kill()
+        raise RuntimeError(f"{source_name} capture timed out")
+
+    if ffmpeg_proc.returncode != 0:
+        raise RuntimeError(f"{source_name} capture failed (ffmpeg exit {ffmpeg_proc.returncode})")
+
+    if len(raw) < 1000:
+        raise RuntimeError(f"{source_name} capture produced empty file")
+
+    # Write the WAV ourselves: a header plus the PCM we already hold, with
+    # no second ffmpeg output or muxing pass
+    with wave.open(output_file, "wb") as wav_out:
+        wav_out.setnchannels(1)
+        wav_out.setsampwidth(2)
+        wav_out.setframerate(16000)
+        wav_out.writeframes(raw)
+
+    samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32)
+
+    # Fingerprint the PCM in-process via the chromaprint bindings when
+    # available; shell out to fpcalc only if the library is missing
+    fp = _fingerprint_pcm(raw)
+    fpcalc_path = None if fp else find_fpcalc()
+    if fpcalc_path:
+        try:
+            result = subprocess.run(
+                [fpcalc_path, "-raw", "-length", "120", "-"],
+                input=_wav_stream_header() + raw,
+                capture_output=True,
+                timeout=60,
+            )
+            if result.returncode == 0:
+                _, sep, rest = result.stdout.decode("utf-8", errors="ignore").partition("FINGERPRINT=")
+                if sep:
+                    fp = rest.split("\n", 1)[0].strip() or None
+        except (subprocess.TimeoutExpired, OSError):
+            fp = None
+
+    return fp, samples